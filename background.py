@@ -0,0 +1,21 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Strong references to fire-and-forget tasks so they are not garbage collected
+_background_tasks = set()
+
+
+def spawn_background(coro, label: str) -> asyncio.Task:
+    """Schedule a coroutine without awaiting it, logging any failure"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+
+    def _done(t: asyncio.Task):
+        _background_tasks.discard(t)
+        if not t.cancelled() and t.exception():
+            logger.error(f"Background task failed ({label}): {t.exception()}")
+
+    task.add_done_callback(_done)
+    return task
@@ -89,11 +89,8 @@ async def send_email_via_composio(
         }
 
 
-async def send_welcome_email(patient_email: str = None, patient_name: str = None):
-    """
-    Send welcome email to patient
-    """
-    body = f"""
+# Welcome email body, filled in with str.format per patient
+WELCOME_EMAIL_TEMPLATE = """
         <html>
         <body style="font-family: Arial, sans-serif; color: #333; background-color: #f5f6fa;">
           <div style="max-width: 540px; margin: 40px auto; background: #fff; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.08); overflow: hidden;">
@@ -126,12 +123,19 @@ async def send_welcome_email(patient_email: str = None, patient_name: str = None
               </p>
             </div>
             <div style="background-color:#f0f4f8; text-align:center; font-size:12px; color:#888; padding:12px;">
-              © {2024} BacklineMD – Confidential and Secure Communication
+              © 2024 BacklineMD – Confidential and Secure Communication
             </div>
           </div>
         </body>
         </html>
+"""
+
+
+async def send_welcome_email(patient_email: str = None, patient_name: str = None):
+    """
+    Send welcome email to patient
     """
+    body = WELCOME_EMAIL_TEMPLATE.format(patient_name=patient_name)
     return await send_email_via_composio(
         to_email=DEMO_EMAIL, subject="Welcome to BacklineMD", body=body
     )
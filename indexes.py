@@ -0,0 +1,134 @@
+import asyncio
+
+from pymongo.errors import OperationFailure
+
+# Every index, as (collection, keys, options). Both the REST server and the MCP
+# server create these on startup, each with its own client, so this module must
+# not import a driver or open a connection itself.
+INDEXES = [
+    # Users
+    ("users", [("tenant_id", 1), ("email", 1)], {"unique": True}),
+    # Patients
+    ("patients", [("tenant_id", 1), ("search.ngrams", 1)], {}),
+    ("patients", [("tenant_id", 1), ("mrn", 1)], {"unique": True}),
+    ("patients", [("tenant_id", 1), ("contact.email", 1)], {}),
+    ("patients", [("tenant_id", 1), ("contact.phone", 1)], {}),
+    # Documents
+    (
+        "documents",
+        [("tenant_id", 1), ("patient_id", 1), ("kind", 1), ("created_at", -1)],
+        {},
+    ),
+    ("documents", [("tenant_id", 1), ("created_at", -1), ("_id", -1)], {}),
+    (
+        "documents",
+        [("tenant_id", 1), ("patient_id", 1), ("created_at", -1), ("_id", -1)],
+        {},
+    ),
+    (
+        "documents",
+        [("tenant_id", 1), ("status", 1), ("created_at", -1), ("_id", -1)],
+        {},
+    ),
+    (
+        "documents",
+        [("tenant_id", 1), ("kind", 1), ("created_at", -1), ("_id", -1)],
+        {},
+    ),
+    # Consent Forms
+    ("consent_forms", [("tenant_id", 1), ("patient_id", 1), ("status", 1)], {}),
+    ("consent_forms", [("tenant_id", 1), ("created_at", -1), ("_id", -1)], {}),
+    (
+        "consent_forms",
+        [("tenant_id", 1), ("patient_id", 1), ("created_at", -1), ("_id", -1)],
+        {},
+    ),
+    (
+        "consent_forms",
+        [("tenant_id", 1), ("status", 1), ("created_at", -1), ("_id", -1)],
+        {},
+    ),
+    # Appointments
+    ("appointments", [("tenant_id", 1), ("provider_id", 1), ("starts_at", 1)], {}),
+    (
+        "appointments",
+        [("tenant_id", 1), ("patient_id", 1), ("starts_at", 1), ("_id", 1)],
+        {},
+    ),
+    ("appointments", [("tenant_id", 1), ("starts_at", 1), ("_id", 1)], {}),
+    # Claims
+    ("claims", [("tenant_id", 1), ("last_event_at", -1), ("_id", -1)], {}),
+    (
+        "claims",
+        [("tenant_id", 1), ("patient_id", 1), ("last_event_at", -1), ("_id", -1)],
+        {},
+    ),
+    (
+        "claims",
+        [("tenant_id", 1), ("status", 1), ("last_event_at", -1), ("_id", -1)],
+        {},
+    ),
+    # Claim Events
+    ("claim_events", [("tenant_id", 1), ("claim_id", 1), ("at", 1)], {}),
+    # Tasks
+    (
+        "tasks",
+        [("tenant_id", 1), ("assignee_id", 1), ("state", 1), ("due_at", 1)],
+        {},
+    ),
+    (
+        "tasks",
+        [("tenant_id", 1), ("source", 1), ("state", 1), ("created_at", -1)],
+        {},
+    ),
+    ("tasks", [("tenant_id", 1), ("patient_id", 1), ("state", 1)], {}),
+    ("tasks", [("tenant_id", 1), ("created_at", -1), ("_id", -1)], {}),
+    (
+        "tasks",
+        [("tenant_id", 1), ("patient_id", 1), ("created_at", -1), ("_id", -1)],
+        {},
+    ),
+    ("tasks", [("tenant_id", 1), ("state", 1), ("created_at", -1), ("_id", -1)], {}),
+    (
+        "tasks",
+        [("tenant_id", 1), ("priority", 1), ("created_at", -1), ("_id", -1)],
+        {},
+    ),
+    # Conversations
+    (
+        "conversations",
+        [("tenant_id", 1), ("subject.patient_id", 1), ("last_msg_at", -1)],
+        {},
+    ),
+    # Messages
+    ("messages", [("tenant_id", 1), ("conversation_id", 1), ("created_at", 1)], {}),
+    # Agent Executions
+    (
+        "agent_executions",
+        [("tenant_id", 1), ("agent", 1), ("status", 1), ("updated_at", -1)],
+        {},
+    ),
+    ("agent_executions", [("tenant_id", 1), ("run_id", 1)], {"unique": True}),
+    # AI Artifacts (TTL)
+    ("ai_artifacts", [("expires_at", 1)], {"expireAfterSeconds": 0}),
+    # Voice Calls
+    ("voice_calls", [("tenant_id", 1), ("patient_id", 1), ("created_at", -1)], {}),
+]
+
+
+async def ensure_index(target_db, collection: str, keys: list, options: dict):
+    """Create one index, warning instead of failing startup if it can't be built"""
+    try:
+        await target_db[collection].create_index(keys, **options)
+    except OperationFailure as e:
+        print(f"Warning: Failed to create index {keys} on {collection}: {e}")
+
+
+async def ensure_indexes(target_db):
+    """Create every index in INDEXES on target_db (idempotent, safe on every start)"""
+    await asyncio.gather(
+        *(
+            ensure_index(target_db, collection, keys, options)
+            for collection, keys, options in INDEXES
+        )
+    )
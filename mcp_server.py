@@ -7,29 +7,128 @@ import asyncio
 import os
 import random
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
+from cachetools import TTLCache
 from dotenv import load_dotenv
 from fastmcp import FastMCP
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient, ReturnDocument
+
+from background import spawn_background
+from indexes import ensure_indexes
+from pagination import after_filter, page_cursor
 
 # Load environment
 load_dotenv()
 
-# Initialize FastMCP server
-mcp = FastMCP("BacklineMD Agent Tools")
+# Import the email integration once at startup rather than inside each tool call
+try:
+    from composio_integration import send_welcome_email
+except Exception as e:
+    print(f"Warning: Email integration unavailable: {e}")
+    send_welcome_email = None
 
-# MongoDB connection
+# MongoDB connection. PyMongo's native asyncio client, rather than Motor, so
+# driver calls and BSON decoding don't hop through a thread pool
 MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
-client = AsyncIOMotorClient(MONGO_URL)
+client = AsyncMongoClient(
+    MONGO_URL,
+    maxPoolSize=200,
+    minPoolSize=10,
+    maxIdleTimeMS=300_000,
+    waitQueueTimeoutMS=5000,
+    serverSelectionTimeoutMS=3000,
+    retryWrites=True,
+    compressors="zstd,zlib",
+)
 db = client.backlinemd
 
 # Default tenant for demo
 DEFAULT_TENANT = os.environ.get("DEFAULT_TENANT", "hackathon-demo")
 
-# Tool permissions for agents
-TOOL_PERMISSIONS = {
+
+def parse_iso(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp, accepting a trailing Z on any Python version"""
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+def clock_time(dt: datetime) -> str:
+    """Format as a 12-hour clock time, e.g. 03:07 PM (same as strftime("%I:%M %p"))"""
+    return (
+        f"{(dt.hour - 1) % 12 + 1:02d}:{dt.minute:02d} {'AM' if dt.hour < 12 else 'PM'}"
+    )
+
+
+# Width of the day-range used by date filters, built once instead of per query
+ONE_DAY = timedelta(days=1)
+
+
+# Pre-generated document IDs, refilled from one urandom read per batch
+_UUID_BATCH = 256
+_uuid_pool: List[str] = []
+
+
+def new_id() -> str:
+    """Return a random (version 4) UUID string for a new document _id"""
+    if not _uuid_pool:
+        buf = os.urandom(16 * _UUID_BATCH)
+        _uuid_pool.extend(
+            str(uuid.UUID(bytes=buf[i : i + 16], version=4))
+            for i in range(0, len(buf), 16)
+        )
+    return _uuid_pool.pop()
+
+
+# Short-lived cache of patient names for the create tools' existence checks
+_patient_cache = TTLCache(maxsize=10_000, ttl=30)
+
+
+async def load_patient(patient_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch a patient's name, served from cache for up to 30 seconds"""
+    patient = _patient_cache.get(patient_id)
+    if patient is None:
+        patient = await db.patients.find_one(
+            {"_id": patient_id, "tenant_id": DEFAULT_TENANT}, {"name": 1}
+        )
+        if patient:
+            _patient_cache[patient_id] = patient
+    return patient
+
+
+# Form templates per tenant; they change rarely, so a minute of staleness is fine
+_template_cache = TTLCache(maxsize=100, ttl=60)
+
+
+async def load_form_templates() -> List[Dict[str, Any]]:
+    """Fetch the tenant's form templates, served from cache for up to 60 seconds"""
+    templates = _template_cache.get(DEFAULT_TENANT)
+    if templates is None:
+        templates = await db.form_templates.find(
+            {"tenant_id": DEFAULT_TENANT}, {"name": 1}
+        ).to_list(length=10)
+        _template_cache[DEFAULT_TENANT] = templates
+    return templates
+
+
+# Denormalized display name, derived from first_name/last_name
+NAME_EXPR = {"$trim": {"input": {"$concat": ["$first_name", " ", "$last_name"]}}}
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    await ensure_indexes(db)
+    yield
+
+
+# Initialize FastMCP server
+mcp = FastMCP("BacklineMD Agent Tools", lifespan=lifespan)
+
+# Tool permissions for agents, as frozensets for O(1) membership checks
+_TOOL_PERMISSION_LISTS = {
     "intake": [
         "find_or_create_patient",
         "update_patient",
@@ -99,25 +198,117 @@ TOOL_PERMISSIONS = {
         "delete_appointment",
     ],
 }
+TOOL_PERMISSIONS = {
+    agent: frozenset(tools) for agent, tools in _TOOL_PERMISSION_LISTS.items()
+}
 
 
 # ==================== PATIENT TOOLS ====================
 
 
 @mcp.tool()
-async def get_patients() -> List[Dict[str, Any]]:
+async def get_patients(offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
     """
-    Get all patients in the system.
+    Get patients in the system, one page at a time.
+
+    Args:
+        offset: Number of patients to skip (for fetching the next page)
+        limit: Maximum number of results
+
+    Returns:
+        List of patient dicts
     """
-    patients = await db.patients.find({"tenant_id": DEFAULT_TENANT}).to_list(length=100)
-    return [
-        {
-            "patient_id": patient["_id"],
-            "first_name": patient["first_name"],
-            "last_name": patient["last_name"],
-        }
-        for patient in patients
-    ]
+    cursor = (
+        db.patients.find(
+            {"tenant_id": DEFAULT_TENANT}, {"first_name": 1, "last_name": 1}
+        )
+        .sort("_id", 1)
+        .skip(offset)
+        .limit(limit)
+        .batch_size(limit)
+    )
+    # Build rows as documents arrive instead of materializing the batch first
+    result = []
+    async for patient in cursor:
+        result.append(
+            {
+                "patient_id": patient["_id"],
+                "first_name": patient["first_name"],
+                "last_name": patient["last_name"],
+            }
+        )
+    return result
+
+
+EXISTING_PATIENT_PROJECTION = {
+    "first_name": 1,
+    "last_name": 1,
+    "name": 1,
+    "contact.email": 1,
+    "contact.phone": 1,
+    "mrn": 1,
+}
+
+
+def existing_patient_summary(existing: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape find_or_create_patient's response for a patient that already exists"""
+    return {
+        "patient_id": existing["_id"],
+        "name": existing.get("name")
+        or f"{existing.get('first_name', '')} {existing.get('last_name', '')}".strip(),
+        "email": existing["contact"]["email"],
+        "phone": existing["contact"]["phone"],
+        "mrn": existing["mrn"],
+        "status": "existing",
+    }
+
+
+# Recently resolved find_or_create_patient lookups, keyed by (tenant, field, value),
+# plus a reverse map so update_patient can evict a patient's entries
+_lookup_cache = TTLCache(maxsize=10_000, ttl=60)
+_lookup_keys = TTLCache(maxsize=10_000, ttl=60)
+
+
+def cache_patient_lookup(key: tuple, summary: Dict[str, Any]):
+    """Remember an existing patient's summary for repeat lookups by email/phone"""
+    _lookup_cache[key] = summary
+    keys = _lookup_keys.get(summary["patient_id"], set())
+    keys.add(key)
+    # Reassign so the reverse entry lives at least as long as the newest lookup
+    _lookup_keys[summary["patient_id"]] = keys
+
+
+def evict_patient_lookups(patient_id: str):
+    """Drop cached lookups for a patient whose contact details or name changed"""
+    for key in _lookup_keys.pop(patient_id, ()):
+        _lookup_cache.pop(key, None)
+
+
+async def send_patient_welcome_email(
+    patient_email: str, patient_name: str, welcome_email_task_id: str
+):
+    """Send the welcome email and mark the intake task done if it went out"""
+    try:
+        email_result = await send_welcome_email(
+            patient_email=patient_email, patient_name=patient_name
+        )
+        print(f"Welcome email sent result: {email_result}")
+
+        # Mark welcome email task as done if email was sent successfully
+        if email_result.get("success"):
+            await db.tasks.update_one(
+                {"_id": welcome_email_task_id, "tenant_id": DEFAULT_TENANT},
+                {
+                    "$set": {
+                        "state": "done",
+                        "updated_at": datetime.now(timezone.utc),
+                    }
+                },
+            )
+            print(f"Welcome email task marked as done")
+    except Exception as e:
+        # Log error but don't fail patient creation
+        print(f"Warning: Failed to send welcome email: {e}")
 
 
 @mcp.tool()
@@ -147,32 +338,35 @@ async def find_or_create_patient(
     Returns:
         Dict with patient_id and patient details
     """
+    now = datetime.now(timezone.utc)
     # Try to find existing patient
     query = {"tenant_id": DEFAULT_TENANT}
 
+    lookup_key = None
     if email:
         query["contact.email"] = email
+        lookup_key = (DEFAULT_TENANT, "email", email)
     elif phone:
         query["contact.phone"] = phone
+        lookup_key = (DEFAULT_TENANT, "phone", phone)
 
-    existing = await db.patients.find_one(query)
-
-    if existing:
-        return {
-            "patient_id": existing["_id"],
-            "name": f"{existing.get('first_name', '')} {existing.get('last_name', '')}".strip()
-            or existing.get("name", ""),
-            "email": existing["contact"]["email"],
-            "phone": existing["contact"]["phone"],
-            "mrn": existing["mrn"],
-            "status": "existing",
-        }
+    # Agents often resolve the same patient several times in a conversation
+    if lookup_key:
+        cached = _lookup_cache.get(lookup_key)
+        if cached:
+            return cached
 
-    # Create new patient
+    # Without a name there is nothing to create, so this is a plain lookup
     if not name:
+        existing = await db.patients.find_one(query, EXISTING_PATIENT_PROJECTION)
+        if existing:
+            summary = existing_patient_summary(existing)
+            if lookup_key:
+                cache_patient_lookup(lookup_key, summary)
+            return summary
         return {"error": "name is required to create a patient"}
 
-    patient_id = str(uuid.uuid4())
+    patient_id = new_id()
     mrn = f"MRN{random.randint(100000, 999999)}"
 
     # Parse name into first_name and last_name
@@ -182,35 +376,41 @@ async def find_or_create_patient(
     full_name = f"{first_name} {last_name}".strip()
 
     # Generate search n-grams
-    ngrams = [
-        full_name.lower().replace(" ", "")[i : i + 3]
-        for i in range(len(full_name.replace(" ", "")) - 2)
-    ]
+    # Deduplicated (order kept) since the array is only matched with $in
+    search_key = full_name.lower().replace(" ", "")
+    ngrams = list(
+        dict.fromkeys(search_key[i : i + 3] for i in range(len(search_key) - 2))
+    )
 
     # Initialize treatment timeline to first stage
     treatment_timeline = [
         {
             "title": "Initial Consultation",
             "status": "pending",
-            "date": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+            "date": now.date().isoformat(),
             "description": "Initial consultation pending",
         }
     ]
 
-    # Calculate age from DOB if provided
+    # Calculate age from DOB if provided, normalizing e.g. 1990-1-5 to 1990-01-05
     age = None
     if dob:
         try:
             dob_date = datetime.strptime(dob, "%Y-%m-%d").date()
-            today = datetime.now(timezone.utc).date()
+            dob = dob_date.isoformat()
+            today = now.date()
             age = (
                 today.year
                 - dob_date.year
                 - ((today.month, today.day) < (dob_date.month, dob_date.day))
             )
-        except:
+        except ValueError:
             pass
 
+    # Generate a simple summary for the new patient, stored with the insert
+    age_text = f"{age}-year-old" if age else "patient"
+    summary_text = f"{age_text} {(gender or 'Unknown').lower()} patient with no documented preconditions. Currently in intake process. Initial consultation pending. Medical records collection in progress."
+
     patient = {
         "_id": patient_id,
         "tenant_id": DEFAULT_TENANT,
@@ -239,48 +439,39 @@ async def find_or_create_patient(
         "profile_image": None,
         "status": "Intake In Progress",
         "treatment_timeline": treatment_timeline,
-        "ai_summary": None,  # Empty initially, will be generated on demand
-        "tasks_count": 0,
+        "ai_summary": summary_text,
+        "ai_summary_generated_at": now,
+        "tasks_count": 3,  # The onboarding tasks created below
         "appointments_count": 0,
         "flagged_count": 0,
         "search": {"ngrams": ngrams},
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "created_at": now,
+        "updated_at": now,
         "created_by": "ai_agent",
     }
 
-    await db.patients.insert_one(patient)
+    # Find and create in one atomic upsert; a pre-image means the patient existed.
+    # contact is set by dotted path so it merges with the field seeded from query.
+    new_fields = {k: v for k, v in patient.items() if k != "contact"}
+    for k, v in patient["contact"].items():
+        new_fields[f"contact.{k}"] = v
+    existing = await db.patients.find_one_and_update(
+        query,
+        {"$setOnInsert": new_fields},
+        projection=EXISTING_PATIENT_PROJECTION,
+        upsert=True,
+        return_document=ReturnDocument.BEFORE,
+    )
+    if existing:
+        summary = existing_patient_summary(existing)
+        if lookup_key:
+            cache_patient_lookup(lookup_key, summary)
+        return summary
 
     # Step 1: Patient is created ✓ (done above)
 
-    # Step 2: Generate AI summary for the patient
-    try:
-        # Generate a simple summary for new patient
-        preconditions_text = (
-            ", ".join(patient.get("preconditions", []))
-            if patient.get("preconditions")
-            else "no documented preconditions"
-        )
-        age_text = f"{age}-year-old" if age else "patient"
-        summary_text = f"{age_text} {patient.get('gender', 'Unknown').lower()} patient with {preconditions_text}. Currently in intake process. Initial consultation pending. Medical records collection in progress."
-
-        # Store summary in patient document
-        await db.patients.update_one(
-            {"_id": patient_id, "tenant_id": DEFAULT_TENANT},
-            {
-                "$set": {
-                    "ai_summary": summary_text,
-                    "ai_summary_generated_at": datetime.now(timezone.utc),
-                }
-            },
-        )
-    except Exception as e:
-        print(f"Warning: Failed to generate AI summary: {e}")
-
     # Get form templates to create default consent forms
-    form_templates = await db.form_templates.find(
-        {"tenant_id": DEFAULT_TENANT}
-    ).to_list(length=10)
+    form_templates = await load_form_templates()
 
     # Default 4 consent forms if no templates exist
     default_forms = [
@@ -306,144 +497,116 @@ async def find_or_create_patient(
     forms_to_create = form_templates if form_templates else default_forms
 
     # Create default consent forms with "to_do" status (always create 4 forms)
-    created_forms = []
+    consent_forms = []
     for i, template in enumerate(forms_to_create[:4]):  # Always create exactly 4 forms
-        consent_form_id = str(uuid.uuid4())
-        consent_form = {
-            "_id": consent_form_id,
-            "tenant_id": DEFAULT_TENANT,
-            "patient_id": patient_id,
-            "patient_name": full_name,
-            "template_id": template.get("_id") or f"template-{i}",
-            "form_type": template.get("name", "consent"),
-            "title": template.get("name", "Consent Form"),
-            "status": "to_do",
-            "sent_via": None,
-            "sent_at": None,
-            "signed_at": None,
-            "created_at": datetime.now(timezone.utc),
-            "updated_at": datetime.now(timezone.utc),
-        }
-        await db.consent_forms.insert_one(consent_form)
-        created_forms.append(consent_form_id)
+        consent_forms.append(
+            {
+                "_id": new_id(),
+                "tenant_id": DEFAULT_TENANT,
+                "patient_id": patient_id,
+                "patient_name": full_name,
+                "template_id": template.get("_id") or f"template-{i}",
+                "form_type": template.get("name", "consent"),
+                "title": template.get("name", "Consent Form"),
+                "status": "to_do",
+                "sent_via": None,
+                "sent_at": None,
+                "signed_at": None,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+    created_forms = [form["_id"] for form in consent_forms]
 
     # Create AI tasks for consent email, document extraction, and welcome email
-    tasks_created = []
+    task_numbers = random.choices(range(10000, 100000), k=3)
 
-    # Task 1: Send consent email - TODO (open)
-    consent_email_task_id = str(uuid.uuid4())
-    consent_email_task = {
-        "_id": consent_email_task_id,
-        "task_id": f"T{random.randint(10000, 99999)}",
+    # Text shared by every onboarding task title and description
+    title_suffix = f" - {full_name}"
+    created_note = f"New patient {full_name} has been created."
+
+    # Fields shared by every onboarding task
+    task_base = {
         "tenant_id": DEFAULT_TENANT,
         "source": "agent",
-        "kind": "consent_forms",
-        "title": f"Send Consent Email to Patient - {full_name}",
-        "description": f"New patient {full_name} has been created. Please send consent forms email to the patient.",
-        "patient_id": patient_id,  # Ensure patient_id is set correctly
+        "patient_id": patient_id,
         "patient_name": full_name,
-        "assigned_to": "Dr. James O'Brien",
-        "agent_type": "care_taker",
-        "priority": "medium",
-        "state": "open",  # TODO state
         "confidence_score": 1.0,
         "waiting_minutes": 0,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "created_at": now,
+        "updated_at": now,
         "created_by": "ai_agent",
     }
-    await db.tasks.insert_one(consent_email_task)
-    tasks_created.append(consent_email_task_id)
-    await db.patients.update_one({"_id": patient_id}, {"$inc": {"tasks_count": 1}})
-    print(
-        f"DEBUG: Created consent email task with patient_id: {patient_id}, task_id: {consent_email_task_id}"
-    )
+
+    # Task 1: Send consent email - TODO (open)
+    consent_email_task = {
+        **task_base,
+        "_id": new_id(),
+        "task_id": f"T{task_numbers[0]}",
+        "kind": "consent_forms",
+        "title": f"Send Consent Email to Patient{title_suffix}",
+        "description": f"{created_note} Please send consent forms email to the patient.",
+        "assigned_to": "Dr. James O'Brien",
+        "agent_type": "care_taker",
+        "priority": "medium",
+        "state": "open",
+    }
 
     # Task 2: Document extraction - TODO (open)
-    doc_extraction_task_id = str(uuid.uuid4())
     doc_extraction_task = {
-        "_id": doc_extraction_task_id,
-        "task_id": f"T{random.randint(10000, 99999)}",
-        "tenant_id": DEFAULT_TENANT,
-        "source": "agent",
+        **task_base,
+        "_id": new_id(),
+        "task_id": f"T{task_numbers[1]}",
         "kind": "document_review",
-        "title": f"Extract and Review Patient Documents - {full_name}",
-        "description": f"New patient {full_name} has been created. Please review and extract information from any uploaded documents. Ensure all medical records are properly processed and indexed.",
-        "patient_id": patient_id,  # Ensure patient_id is set correctly
-        "patient_name": full_name,
+        "title": f"Extract and Review Patient Documents{title_suffix}",
+        "description": f"{created_note} Please review and extract information from any uploaded documents. Ensure all medical records are properly processed and indexed.",
         "assigned_to": "AI - Document Extractor",
         "agent_type": "doc_extraction",
         "priority": "medium",
-        "state": "open",  # TODO state
-        "confidence_score": 1.0,
-        "waiting_minutes": 0,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
-        "created_by": "ai_agent",
+        "state": "open",
     }
-    await db.tasks.insert_one(doc_extraction_task)
-    tasks_created.append(doc_extraction_task_id)
-    await db.patients.update_one({"_id": patient_id}, {"$inc": {"tasks_count": 1}})
-    print(
-        f"DEBUG: Created document extraction task with patient_id: {patient_id}, task_id: {doc_extraction_task_id}"
-    )
 
     # Task 3: Intake agent - send welcome email asking for medical records (in_progress)
-    welcome_email_task_id = str(uuid.uuid4())
+    welcome_email_task_id = new_id()
     welcome_email_task = {
+        **task_base,
         "_id": welcome_email_task_id,
-        "task_id": f"T{random.randint(10000, 99999)}",
-        "tenant_id": DEFAULT_TENANT,
-        "source": "agent",
+        "task_id": f"T{task_numbers[2]}",
         "kind": "welcome_email",
-        "title": f"Send Welcome Email and Request Medical Records - {full_name}",
-        "description": f"New patient {full_name} has been created. Send welcome email and request medical records from the patient.",
-        "patient_id": patient_id,  # Ensure patient_id is set correctly
-        "patient_name": full_name,
+        "title": f"Send Welcome Email and Request Medical Records{title_suffix}",
+        "description": f"{created_note} Send welcome email and request medical records from the patient.",
         "assigned_to": "AI - Intake Agent",
         "agent_type": "intake",
         "priority": "high",
-        "state": "in_progress",  # Set to in_progress as requested
-        "confidence_score": 1.0,
-        "waiting_minutes": 0,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
-        "created_by": "ai_agent",
+        "state": "in_progress",
     }
-    await db.tasks.insert_one(welcome_email_task)
-    tasks_created.append(welcome_email_task_id)
-    await db.patients.update_one({"_id": patient_id}, {"$inc": {"tasks_count": 1}})
-    print(
-        f"DEBUG: Created welcome email task with patient_id: {patient_id}, task_id: {welcome_email_task_id}"
+
+    onboarding_tasks = [consent_email_task, doc_extraction_task, welcome_email_task]
+    tasks_created = [task["_id"] for task in onboarding_tasks]
+
+    # Consent forms and tasks are independent batches, write them concurrently
+    await asyncio.gather(
+        db.consent_forms.insert_many(consent_forms, ordered=False),
+        db.tasks.insert_many(onboarding_tasks, ordered=False),
     )
     print(
-        f"DEBUG: All tasks created for patient_id: {patient_id}, total: {len(tasks_created)}"
+        f"DEBUG: Created {len(tasks_created)} tasks for patient_id: {patient_id}, "
+        f"task_ids: {tasks_created}"
     )
 
     # Step 3: Tasks are created ✓ (done above)
 
-    # Step 4: Send welcome email using send_welcome_email function
-    email_result = None
-    try:
-        from composio_integration import send_welcome_email
-
-        # Send welcome email
-        email_result = await send_welcome_email(
-            patient_email=patient["contact"]["email"], patient_name=full_name
+    # Step 4: Send welcome email in the background so the tool doesn't wait on it
+    email_queued = send_welcome_email is not None
+    if email_queued:
+        spawn_background(
+            send_patient_welcome_email(
+                patient["contact"]["email"], full_name, welcome_email_task_id
+            ),
+            "welcome email",
         )
-        print(f"Welcome email sent result: {email_result}")
-
-        # Mark welcome email task as done if email was sent successfully
-        if email_result.get("success"):
-            await db.tasks.update_one(
-                {"_id": welcome_email_task_id, "tenant_id": DEFAULT_TENANT},
-                {"$set": {"state": "done", "updated_at": datetime.now(timezone.utc)}},
-            )
-            print(f"Welcome email task marked as done")
-    except Exception as e:
-        # Log error but don't fail patient creation
-        print(f"Warning: Failed to send welcome email: {e}")
-        email_result = {"success": False, "error": str(e)}
+    else:
+        print("Warning: Failed to send welcome email: integration is not configured")
 
     return {
         "patient_id": patient_id,
@@ -458,7 +621,7 @@ async def find_or_create_patient(
         "insurance_policy_number": insurance_policy_number,
         "consent_forms_created": len(created_forms),
         "tasks_created": len(tasks_created),
-        "email_sent": email_result.get("success", False) if email_result else False,
+        "email_sent": "queued" if email_queued else False,
     }
 
 
@@ -516,15 +679,29 @@ async def update_patient(
 
     update_fields["updated_at"] = datetime.now(timezone.utc)
 
-    result = await db.patients.update_one(
-        {"_id": patient_id, "tenant_id": DEFAULT_TENANT}, {"$set": update_fields}
+    # Pipeline update so name is re-derived from the stored first/last names;
+    # values are wrapped in $literal so strings starting with "$" stay literal
+    patient = await db.patients.find_one_and_update(
+        {"_id": patient_id, "tenant_id": DEFAULT_TENANT},
+        [
+            {"$set": {k: {"$literal": v} for k, v in update_fields.items()}},
+            {"$set": {"name": NAME_EXPR}},
+        ],
+        projection={
+            "first_name": 1,
+            "last_name": 1,
+            "contact.email": 1,
+            "contact.phone": 1,
+            "status": 1,
+        },
+        return_document=ReturnDocument.AFTER,
     )
+    _patient_cache.pop(patient_id, None)
+    evict_patient_lookups(patient_id)
 
-    if result.matched_count == 0:
+    if not patient:
         return {"error": "Patient not found"}
 
-    patient = await db.patients.find_one({"_id": patient_id})
-
     return {
         "success": True,
         "patient_id": patient_id,
@@ -547,6 +724,7 @@ async def get_appointments(
     patient_id: Optional[str] = None,
     date: Optional[str] = None,
     status: Optional[str] = None,
+    offset: int = 0,
     limit: int = 50,
 ) -> List[Dict[str, Any]]:
     """
@@ -556,6 +734,7 @@ async def get_appointments(
         patient_id: Filter by patient ID
         date: Filter by date (YYYY-MM-DD) or 'today'
         status: Filter by status (scheduled, completed, cancelled)
+        offset: Number of results to skip (for fetching the next page)
         limit: Maximum number of results
 
     Returns:
@@ -569,40 +748,61 @@ async def get_appointments(
     if status:
         query["status"] = status
 
-    if date == "today":
-        today = datetime.now(timezone.utc).date()
-        query["starts_at"] = {
-            "$gte": datetime.combine(today, datetime.min.time()),
-            "$lt": datetime.combine(today + timedelta(days=1), datetime.min.time()),
-        }
-    elif date:
-        date_obj = datetime.strptime(date, "%Y-%m-%d").date()
-        query["starts_at"] = {
-            "$gte": datetime.combine(date_obj, datetime.min.time()),
-            "$lt": datetime.combine(date_obj + timedelta(days=1), datetime.min.time()),
-        }
-
-    cursor = db.appointments.find(query).sort("starts_at", 1).limit(limit)
-    appointments = await cursor.to_list(length=limit)
-
-    # Batch fetch patients
-    patient_ids = list(set(apt["patient_id"] for apt in appointments))
-    patients_cursor = db.patients.find({"_id": {"$in": patient_ids}})
-    patients_list = await patients_cursor.to_list(length=len(patient_ids))
-    patients_map = {p["_id"]: p for p in patients_list}
+    if date:
+        if date == "today":
+            now = datetime.now(timezone.utc)
+            day_start = datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
+        else:
+            day_start = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        query["starts_at"] = {"$gte": day_start, "$lt": day_start + ONE_DAY}
+
+    # Resolve patient names server-side with $lookup instead of a second query
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"starts_at": 1, "_id": 1}},
+        {"$skip": offset},
+    ]
+    # limit=0 means no limit, as with find(); $limit itself rejects 0
+    if limit > 0:
+        pipeline.append({"$limit": limit})
+    pipeline += [
+        {
+            "$project": {
+                "patient_id": 1,
+                "type": 1,
+                "starts_at": 1,
+                "ends_at": 1,
+                "status": 1,
+                "location": 1,
+                "title": 1,
+            }
+        },
+        {
+            "$lookup": {
+                "from": "patients",
+                "localField": "patient_id",
+                "foreignField": "_id",
+                "pipeline": [
+                    {"$match": {"tenant_id": DEFAULT_TENANT}},
+                    {"$project": {"name": 1}},
+                ],
+                "as": "patient",
+            }
+        },
+        {"$unwind": {"path": "$patient", "preserveNullAndEmptyArrays": True}},
+    ]
+    cursor = await db.appointments.aggregate(
+        pipeline, batchSize=limit if limit > 0 else None
+    )
 
     result = []
-    for apt in appointments:
-        patient = patients_map.get(apt["patient_id"])
+    async for apt in cursor:
+        patient = apt.get("patient")
         result.append(
             {
                 "appointment_id": apt["_id"],
                 "patient_id": apt["patient_id"],
-                "patient_name": (
-                    f"{patient['first_name']} {patient['last_name']}"
-                    if patient
-                    else "Unknown"
-                ),
+                "patient_name": patient["name"] if patient else "Unknown",
                 "type": apt["type"],
                 "starts_at": apt["starts_at"].isoformat(),
                 "ends_at": apt["ends_at"].isoformat(),
@@ -640,14 +840,8 @@ async def create_appointment(
     Returns:
         Dict with appointment_id and details
     """
-    # Verify patient exists
-    patient = await db.patients.find_one(
-        {"_id": patient_id, "tenant_id": DEFAULT_TENANT}
-    )
-    if not patient:
-        return {"error": "Patient not found"}
-
-    appointment_id = str(uuid.uuid4())
+    now = datetime.now(timezone.utc)
+    appointment_id = new_id()
 
     appointment = {
         "_id": appointment_id,
@@ -656,33 +850,33 @@ async def create_appointment(
         "provider_id": provider_id,
         "type": type,
         "title": title or f"{type.title()} Appointment",
-        "starts_at": datetime.fromisoformat(starts_at.replace("Z", "+00:00")),
-        "ends_at": datetime.fromisoformat(ends_at.replace("Z", "+00:00")),
+        "starts_at": parse_iso(starts_at),
+        "ends_at": parse_iso(ends_at),
         "location": location or "Main Office",
         "status": "scheduled",
         "google_calendar": {
             "event_id": f"mock-event-{appointment_id[:8]}",
             "calendar_id": "primary",
         },
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "created_at": now,
+        "updated_at": now,
     }
 
-    # Use transaction
-    if client:
-        async with client.start_session() as session:
-            async with session.start_transaction():
-                await db.appointments.insert_one(appointment, session=session)
-                await db.patients.update_one(
-                    {"_id": patient_id},
-                    {"$inc": {"appointments_count": 1}},
-                    session=session,
-                )
-    else:
+    # Verify patient exists and bump its counter in a single round trip
+    result = await db.patients.update_one(
+        {"_id": patient_id, "tenant_id": DEFAULT_TENANT},
+        {"$inc": {"appointments_count": 1}},
+    )
+    if result.matched_count == 0:
+        return {"error": "Patient not found"}
+
+    try:
         await db.appointments.insert_one(appointment)
+    except Exception:
         await db.patients.update_one(
-            {"_id": patient_id}, {"$inc": {"appointments_count": 1}}
+            {"_id": patient_id}, {"$inc": {"appointments_count": -1}}
         )
+        raise
 
     return {
         "appointment_id": appointment_id,
@@ -723,13 +917,9 @@ async def update_appointment(
     if status:
         update_fields["status"] = status
     if starts_at:
-        update_fields["starts_at"] = datetime.fromisoformat(
-            starts_at.replace("Z", "+00:00")
-        )
+        update_fields["starts_at"] = parse_iso(starts_at)
     if ends_at:
-        update_fields["ends_at"] = datetime.fromisoformat(
-            ends_at.replace("Z", "+00:00")
-        )
+        update_fields["ends_at"] = parse_iso(ends_at)
     if location:
         update_fields["location"] = location
     if title:
@@ -762,31 +952,22 @@ async def delete_appointment(appointment_id: str) -> Dict[str, Any]:
     Returns:
         Dict with success status
     """
-    # Get appointment to find patient
-    appointment = await db.appointments.find_one(
-        {"_id": appointment_id, "tenant_id": DEFAULT_TENANT}
+    # Fetch patient_id and delete in one round trip
+    appointment = await db.appointments.find_one_and_delete(
+        {"_id": appointment_id, "tenant_id": DEFAULT_TENANT},
+        projection={"patient_id": 1},
     )
 
     if not appointment:
         return {"error": "Appointment not found"}
 
-    # Use transaction
-    if client:
-        async with client.start_session() as session:
-            async with session.start_transaction():
-                await db.appointments.delete_one(
-                    {"_id": appointment_id}, session=session
-                )
-                await db.patients.update_one(
-                    {"_id": appointment["patient_id"]},
-                    {"$inc": {"appointments_count": -1}},
-                    session=session,
-                )
-    else:
-        await db.appointments.delete_one({"_id": appointment_id})
-        await db.patients.update_one(
+    # The counter is denormalized for display, so don't hold the response on it
+    spawn_background(
+        db.patients.update_one(
             {"_id": appointment["patient_id"]}, {"$inc": {"appointments_count": -1}}
-        )
+        ),
+        "decrement appointments_count",
+    )
 
     return {
         "success": True,
@@ -802,6 +983,7 @@ async def delete_appointment(appointment_id: str) -> Dict[str, Any]:
 async def get_insurance_claims(
     patient_id: Optional[str] = None,
     status: Optional[str] = None,
+    offset: int = 0,
     limit: int = 50,
 ) -> List[Dict[str, Any]]:
     """
@@ -810,6 +992,7 @@ async def get_insurance_claims(
     Args:
         patient_id: Filter by patient ID
         status: Filter by status (pending, submitted, approved, denied)
+        offset: Number of results to skip (for fetching the next page)
         limit: Maximum number of results
 
     Returns:
@@ -822,25 +1005,45 @@ async def get_insurance_claims(
     if status:
         query["status"] = status
 
-    cursor = db.claims.find(query).sort("last_event_at", -1).limit(limit)
-    claims = await cursor.to_list(length=limit)
-
-    return [
-        {
-            "claim_id": claim["_id"],
-            "claim_id_display": claim["claim_id"],
-            "patient_id": claim["patient_id"],
-            "patient_name": claim["patient_name"],
-            "insurance_provider": claim["insurance_provider"],
-            "amount": claim["amount_display"],
-            "status": claim["status"],
-            "submitted_date": claim["submitted_date"],
-            "procedure_code": claim.get("procedure_code"),
-            "diagnosis_code": claim.get("diagnosis_code"),
-            "description": claim.get("description"),
-        }
-        for claim in claims
-    ]
+    cursor = (
+        db.claims.find(
+            query,
+            {
+                "claim_id": 1,
+                "patient_id": 1,
+                "patient_name": 1,
+                "insurance_provider": 1,
+                "amount_display": 1,
+                "status": 1,
+                "submitted_date": 1,
+                "procedure_code": 1,
+                "diagnosis_code": 1,
+                "description": 1,
+            },
+        )
+        .sort([("last_event_at", -1), ("_id", -1)])
+        .skip(offset)
+        .limit(limit)
+        .batch_size(limit)
+    )
+    result = []
+    async for claim in cursor:
+        result.append(
+            {
+                "claim_id": claim["_id"],
+                "claim_id_display": claim["claim_id"],
+                "patient_id": claim["patient_id"],
+                "patient_name": claim["patient_name"],
+                "insurance_provider": claim["insurance_provider"],
+                "amount": claim["amount_display"],
+                "status": claim["status"],
+                "submitted_date": claim["submitted_date"],
+                "procedure_code": claim.get("procedure_code"),
+                "diagnosis_code": claim.get("diagnosis_code"),
+                "description": claim.get("description"),
+            }
+        )
+    return result
 
 
 @mcp.tool()
@@ -868,14 +1071,13 @@ async def create_insurance_claim(
     Returns:
         Dict with claim_id and details
     """
+    now = datetime.now(timezone.utc)
     # Verify patient exists
-    patient = await db.patients.find_one(
-        {"_id": patient_id, "tenant_id": DEFAULT_TENANT}
-    )
+    patient = await load_patient(patient_id)
     if not patient:
         return {"error": "Patient not found"}
 
-    claim_id = str(uuid.uuid4())
+    claim_id = new_id()
     claim_id_display = f"C{random.randint(10000, 99999)}"
 
     claim = {
@@ -883,36 +1085,37 @@ async def create_insurance_claim(
         "claim_id": claim_id_display,
         "tenant_id": DEFAULT_TENANT,
         "patient_id": patient_id,
-        "patient_name": f"{patient['first_name']} {patient['last_name']}",
+        "patient_name": patient["name"],
         "insurance_provider": insurance_provider,
         "amount": int(amount * 100),  # Store in cents
         "amount_display": amount,
         "procedure_code": procedure_code,
         "diagnosis_code": diagnosis_code,
         "service_date": service_date,
-        "submitted_date": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+        "submitted_date": now.date().isoformat(),
         "description": description or f"Claim for {procedure_code}",
         "status": "pending",
-        "last_event_at": datetime.now(timezone.utc),
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "last_event_at": now,
+        "created_at": now,
+        "updated_at": now,
     }
 
-    await db.claims.insert_one(claim)
-
     # Create initial event
     event = {
-        "_id": str(uuid.uuid4()),
+        "_id": new_id(),
         "tenant_id": DEFAULT_TENANT,
         "claim_id": claim_id,
         "event_type": "submitted",
         "description": f"Claim submitted to {insurance_provider} for ${amount:.2f}",
-        "at": datetime.now(timezone.utc),
-        "time": datetime.now(timezone.utc).strftime("%I:%M %p"),
-        "created_at": datetime.now(timezone.utc),
+        "at": now,
+        "time": clock_time(now),
+        "created_at": now,
     }
 
-    await db.claim_events.insert_one(event)
+    # Only record the event once the claim exists, so a failed insert leaves no orphan.
+    # No tool response depends on the event, so it is written off the request path.
+    await db.claims.insert_one(claim)
+    spawn_background(db.claim_events.insert_one(event), "claim event")
 
     return {
         "claim_id": claim_id,
@@ -943,6 +1146,7 @@ async def update_insurance_claim(
     Returns:
         Dict with success status
     """
+    now = datetime.now(timezone.utc)
     update_fields = {}
 
     if amount is not None:
@@ -950,9 +1154,13 @@ async def update_insurance_claim(
         update_fields["amount_display"] = amount
     if status:
         update_fields["status"] = status
-        update_fields["last_event_at"] = datetime.now(timezone.utc)
+        update_fields["last_event_at"] = now
 
-    update_fields["updated_at"] = datetime.now(timezone.utc)
+    # Nothing to change, so skip the write
+    if not update_fields:
+        return {"success": True, "claim_id": claim_id, "updated_fields": []}
+
+    update_fields["updated_at"] = now
 
     result = await db.claims.update_one(
         {"_id": claim_id, "tenant_id": DEFAULT_TENANT}, {"$set": update_fields}
@@ -964,16 +1172,16 @@ async def update_insurance_claim(
     # Create event if status changed
     if status:
         event = {
-            "_id": str(uuid.uuid4()),
+            "_id": new_id(),
             "tenant_id": DEFAULT_TENANT,
             "claim_id": claim_id,
             "event_type": status,
             "description": reason or f"Claim status changed to {status}",
-            "at": datetime.now(timezone.utc),
-            "time": datetime.now(timezone.utc).strftime("%I:%M %p"),
-            "created_at": datetime.now(timezone.utc),
+            "at": now,
+            "time": clock_time(now),
+            "created_at": now,
         }
-        await db.claim_events.insert_one(event)
+        spawn_background(db.claim_events.insert_one(event), "claim event")
 
     return {
         "success": True,
@@ -1008,14 +1216,13 @@ async def create_document(
     Returns:
         Dict with document_id and details
     """
+    now = datetime.now(timezone.utc)
     # Verify patient exists
-    patient = await db.patients.find_one(
-        {"_id": patient_id, "tenant_id": DEFAULT_TENANT}
-    )
+    patient = await load_patient(patient_id)
     if not patient:
         return {"error": "Patient not found"}
 
-    document_id = str(uuid.uuid4())
+    document_id = new_id()
 
     document = {
         "_id": document_id,
@@ -1032,8 +1239,8 @@ async def create_document(
         "ocr": {"done": False, "engine": None},
         "extracted": extracted_data or {},
         "status": "uploaded" if not extracted_data else "ingested",
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "created_at": now,
+        "updated_at": now,
     }
 
     await db.documents.insert_one(document)
@@ -1071,6 +1278,9 @@ async def update_document(
     if extracted_data:
         update_fields["extracted"] = extracted_data
 
+    if not update_fields:
+        return {"success": True, "document_id": document_id, "updated_fields": []}
+
     update_fields["updated_at"] = datetime.now(timezone.utc)
 
     result = await db.documents.update_one(
@@ -1093,7 +1303,8 @@ async def get_documents(
     kind: Optional[str] = None,
     status: Optional[str] = None,
     limit: int = 50,
-) -> List[Dict[str, Any]]:
+    after: Optional[str] = None,
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get documents filtered by patient, kind, or status.
 
@@ -1102,6 +1313,7 @@ async def get_documents(
         kind: Filter by document kind
         status: Filter by status
         limit: Maximum number of results
+        after: Resume after this row; pass the "cursor" of the last row of the previous page
 
     Returns:
         List of document dicts
@@ -1114,23 +1326,45 @@ async def get_documents(
         query["kind"] = kind
     if status:
         query["status"] = status
+    if after:
+        try:
+            query.update(after_filter(after))
+        except ValueError:
+            return {"error": "invalid cursor"}
 
-    cursor = db.documents.find(query).sort("created_at", -1).limit(limit)
-    documents = await cursor.to_list(length=limit)
-
-    return [
-        {
-            "document_id": doc["_id"],
-            "patient_id": doc["patient_id"],
-            "kind": doc["kind"],
-            "filename": doc["file"]["name"],
-            "file_url": doc["file"]["url"],
-            "status": doc["status"],
-            "extracted": doc.get("extracted", {}),
-            "created_at": doc["created_at"].isoformat(),
-        }
-        for doc in documents
-    ]
+    cursor = (
+        db.documents.find(
+            query,
+            {
+                "patient_id": 1,
+                "kind": 1,
+                "file.name": 1,
+                "file.url": 1,
+                "status": 1,
+                "extracted": 1,
+                "created_at": 1,
+            },
+        )
+        .sort([("created_at", -1), ("_id", -1)])
+        .limit(limit)
+        .batch_size(limit)
+    )
+    result = []
+    async for doc in cursor:
+        result.append(
+            {
+                "document_id": doc["_id"],
+                "patient_id": doc["patient_id"],
+                "kind": doc["kind"],
+                "filename": doc["file"]["name"],
+                "file_url": doc["file"]["url"],
+                "status": doc["status"],
+                "extracted": doc.get("extracted", {}),
+                "created_at": doc["created_at"].isoformat(),
+                "cursor": page_cursor(doc["created_at"], doc["_id"]),
+            }
+        )
+    return result
 
 
 # ==================== CONSENT FORM TOOLS ====================
@@ -1157,29 +1391,28 @@ async def create_consent_form(
     Returns:
         Dict with consent_form_id and details
     """
+    now = datetime.now(timezone.utc)
     # Verify patient exists
-    patient = await db.patients.find_one(
-        {"_id": patient_id, "tenant_id": DEFAULT_TENANT}
-    )
+    patient = await load_patient(patient_id)
     if not patient:
         return {"error": "Patient not found"}
 
-    consent_form_id = str(uuid.uuid4())
+    consent_form_id = new_id()
 
     consent_form = {
         "_id": consent_form_id,
         "tenant_id": DEFAULT_TENANT,
         "patient_id": patient_id,
-        "patient_name": f"{patient['first_name']} {patient['last_name']}",
+        "patient_name": patient["name"],
         "template_id": template_id,
         "form_type": form_type,
         "title": title,
         "status": "sent" if send_method else "to_do",
         "sent_via": send_method if send_method else None,
-        "sent_at": datetime.now(timezone.utc) if send_method else None,
+        "sent_at": now if send_method else None,
         "signed_at": None,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "created_at": now,
+        "updated_at": now,
     }
 
     await db.consent_forms.insert_one(consent_form)
@@ -1205,7 +1438,20 @@ async def get_patient(patient_id: str) -> Dict[str, Any]:
         Dict with patient details
     """
     patient = await db.patients.find_one(
-        {"_id": patient_id, "tenant_id": DEFAULT_TENANT}
+        {"_id": patient_id, "tenant_id": DEFAULT_TENANT},
+        {
+            "mrn": 1,
+            "first_name": 1,
+            "last_name": 1,
+            "dob": 1,
+            "gender": 1,
+            "contact": 1,
+            "preconditions": 1,
+            "status": 1,
+            "tasks_count": 1,
+            "appointments_count": 1,
+            "flagged_count": 1,
+        },
     )
 
     if not patient:
@@ -1244,49 +1490,53 @@ async def send_consent_forms(
     Returns:
         Dict with consent form IDs and details
     """
-    # Verify patient exists
-    patient = await db.patients.find_one(
-        {"_id": patient_id, "tenant_id": DEFAULT_TENANT}
+    if not form_template_ids:
+        return {"error": "No form templates found"}
+
+    now = datetime.now(timezone.utc)
+    # Verify patient exists and get form templates (independent, so concurrently)
+    patient, templates = await asyncio.gather(
+        load_patient(patient_id),
+        db.form_templates.find(
+            {"_id": {"$in": form_template_ids}, "tenant_id": DEFAULT_TENANT},
+            {"name": 1},
+        ).to_list(length=len(form_template_ids)),
     )
     if not patient:
         return {"error": "Patient not found"}
 
-    # Get form templates
-    templates_cursor = db.form_templates.find(
-        {"_id": {"$in": form_template_ids}, "tenant_id": DEFAULT_TENANT}
-    )
-    templates = await templates_cursor.to_list(length=len(form_template_ids))
-
     if not templates:
         return {"error": "No form templates found"}
 
+    patient_name = patient["name"]
+    consent_forms = []
     created_forms = []
 
     for template in templates:
-        consent_form_id = str(uuid.uuid4())
+        consent_form_id = new_id()
 
         consent_form = {
             "_id": consent_form_id,
             "tenant_id": DEFAULT_TENANT,
             "patient_id": patient_id,
-            "patient_name": f"{patient['first_name']} {patient['last_name']}",
+            "patient_name": patient_name,
             "template_id": template["_id"],
             "form_type": template.get("name", "consent"),
             "title": template.get("name", "Consent Form"),
             "status": "sent",
             "sent_via": send_method,
-            "sent_at": datetime.now(timezone.utc),
+            "sent_at": now,
             "signed_at": None,
             "docusign": {
                 "envelope_id": f"env-{consent_form_id[:8]}",
                 "status": "sent",
                 "envelope_url": f"https://demo.docusign.com/envelope/{consent_form_id[:8]}",
             },
-            "created_at": datetime.now(timezone.utc),
-            "updated_at": datetime.now(timezone.utc),
+            "created_at": now,
+            "updated_at": now,
         }
 
-        await db.consent_forms.insert_one(consent_form)
+        consent_forms.append(consent_form)
         created_forms.append(
             {
                 "consent_form_id": consent_form_id,
@@ -1296,6 +1546,8 @@ async def send_consent_forms(
             }
         )
 
+    await db.consent_forms.insert_many(consent_forms, ordered=False)
+
     return {
         "success": True,
         "patient_id": patient_id,
@@ -1325,9 +1577,14 @@ async def update_consent_form(
     if status:
         update_fields["status"] = status
     if signed_at:
-        update_fields["signed_at"] = datetime.fromisoformat(
-            signed_at.replace("Z", "+00:00")
-        )
+        update_fields["signed_at"] = parse_iso(signed_at)
+
+    if not update_fields:
+        return {
+            "success": True,
+            "consent_form_id": consent_form_id,
+            "updated_fields": [],
+        }
 
     update_fields["updated_at"] = datetime.now(timezone.utc)
 
@@ -1347,8 +1604,11 @@ async def update_consent_form(
 
 @mcp.tool()
 async def get_consent_forms(
-    patient_id: Optional[str] = None, status: Optional[str] = None, limit: int = 50
-) -> List[Dict[str, Any]]:
+    patient_id: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 50,
+    after: Optional[str] = None,
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get consent forms filtered by patient or status.
 
@@ -1356,6 +1616,7 @@ async def get_consent_forms(
         patient_id: Filter by patient ID
         status: Filter by status
         limit: Maximum number of results
+        after: Resume after this row; pass the "cursor" of the last row of the previous page
 
     Returns:
         List of consent form dicts
@@ -1366,25 +1627,48 @@ async def get_consent_forms(
         query["patient_id"] = patient_id
     if status:
         query["status"] = status
+    if after:
+        try:
+            query.update(after_filter(after))
+        except ValueError:
+            return {"error": "invalid cursor"}
 
-    cursor = db.consent_forms.find(query).sort("created_at", -1).limit(limit)
-    forms = await cursor.to_list(length=limit)
-
-    return [
-        {
-            "consent_form_id": form["_id"],
-            "patient_id": form["patient_id"],
-            "patient_name": form["patient_name"],
-            "form_type": form["form_type"],
-            "title": form["title"],
-            "status": form["status"],
-            "sent_at": form["sent_at"].isoformat() if form.get("sent_at") else None,
-            "signed_at": (
-                form["signed_at"].isoformat() if form.get("signed_at") else None
-            ),
-        }
-        for form in forms
-    ]
+    cursor = (
+        db.consent_forms.find(
+            query,
+            {
+                "patient_id": 1,
+                "patient_name": 1,
+                "form_type": 1,
+                "title": 1,
+                "status": 1,
+                "sent_at": 1,
+                "signed_at": 1,
+                "created_at": 1,
+            },
+        )
+        .sort([("created_at", -1), ("_id", -1)])
+        .limit(limit)
+        .batch_size(limit)
+    )
+    result = []
+    async for form in cursor:
+        result.append(
+            {
+                "consent_form_id": form["_id"],
+                "patient_id": form["patient_id"],
+                "patient_name": form["patient_name"],
+                "form_type": form["form_type"],
+                "title": form["title"],
+                "status": form["status"],
+                "sent_at": form["sent_at"].isoformat() if form.get("sent_at") else None,
+                "signed_at": (
+                    form["signed_at"].isoformat() if form.get("signed_at") else None
+                ),
+                "cursor": page_cursor(form["created_at"], form["_id"]),
+            }
+        )
+    return result
 
 
 # ==================== TASK TOOLS ====================
@@ -1415,14 +1699,17 @@ async def create_task(
     Returns:
         Dict with task_id and details
     """
-    # Verify patient exists
-    patient = await db.patients.find_one(
-        {"_id": patient_id, "tenant_id": DEFAULT_TENANT}
+    now = datetime.now(timezone.utc)
+    # Verify patient exists and bump its counter in a single round trip
+    patient = await db.patients.find_one_and_update(
+        {"_id": patient_id, "tenant_id": DEFAULT_TENANT},
+        {"$inc": {"tasks_count": 1}},
+        projection={"name": 1},
     )
     if not patient:
         return {"error": "Patient not found"}
 
-    task_id = str(uuid.uuid4())
+    task_id = new_id()
     task_id_display = f"T{random.randint(10000, 99999)}"
 
     task = {
@@ -1434,29 +1721,23 @@ async def create_task(
         "title": title,
         "description": description,
         "patient_id": patient_id,
-        "patient_name": f"{patient['first_name']} {patient['last_name']}",
+        "patient_name": patient["name"],
         "assigned_to": assigned_to,
         "agent_type": agent_type,
         "priority": priority,
         "state": "open",
         "confidence_score": 1.0,
         "waiting_minutes": 0,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "created_at": now,
+        "updated_at": now,
         "created_by": "ai_agent",
     }
 
-    # Use transaction
-    if client:
-        async with client.start_session() as session:
-            async with session.start_transaction():
-                await db.tasks.insert_one(task, session=session)
-                await db.patients.update_one(
-                    {"_id": patient_id}, {"$inc": {"tasks_count": 1}}, session=session
-                )
-    else:
+    try:
         await db.tasks.insert_one(task)
-        await db.patients.update_one({"_id": patient_id}, {"$inc": {"tasks_count": 1}})
+    except Exception:
+        await db.patients.update_one({"_id": patient_id}, {"$inc": {"tasks_count": -1}})
+        raise
 
     return {
         "task_id": task_id,
@@ -1488,25 +1769,32 @@ async def update_task(
     Returns:
         Dict with success status
     """
+    now = datetime.now(timezone.utc)
     update_fields = {}
 
     if state:
         update_fields["state"] = state
     if priority:
         update_fields["priority"] = priority
+
+    if not update_fields and not comment:
+        return {"success": True, "task_id": task_id, "updated_fields": []}
+
+    update_fields["updated_at"] = now
+    update = {"$set": update_fields}
+
+    # Comments are appended with $push alongside the $set in the same update
     if comment:
-        update_fields["$push"] = {
+        update["$push"] = {
             "comments": {
                 "user_id": "ai_agent",
                 "text": comment,
-                "created_at": datetime.now(timezone.utc),
+                "created_at": now,
             }
         }
 
-    update_fields["updated_at"] = datetime.now(timezone.utc)
-
     result = await db.tasks.update_one(
-        {"_id": task_id, "tenant_id": DEFAULT_TENANT}, {"$set": update_fields}
+        {"_id": task_id, "tenant_id": DEFAULT_TENANT}, update
     )
 
     if result.matched_count == 0:
@@ -1515,7 +1803,8 @@ async def update_task(
     return {
         "success": True,
         "task_id": task_id,
-        "updated_fields": list(update_fields.keys()),
+        "updated_fields": list(update_fields.keys())
+        + (["comments"] if comment else []),
     }
 
 
@@ -1525,7 +1814,8 @@ async def get_tasks(
     state: Optional[str] = None,
     priority: Optional[str] = None,
     limit: int = 50,
-) -> List[Dict[str, Any]]:
+    after: Optional[str] = None,
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Get tasks filtered by patient, state, or priority.
 
@@ -1534,6 +1824,7 @@ async def get_tasks(
         state: Filter by state (open, in_progress, done, cancelled)
         priority: Filter by priority (urgent, high, medium, low)
         limit: Maximum number of results
+        after: Resume after this row; pass the "cursor" of the last row of the previous page
 
     Returns:
         List of task dicts
@@ -1546,27 +1837,53 @@ async def get_tasks(
         query["state"] = state
     if priority:
         query["priority"] = priority
+    if after:
+        try:
+            query.update(after_filter(after))
+        except ValueError:
+            return {"error": "invalid cursor"}
 
-    cursor = db.tasks.find(query).sort("created_at", -1).limit(limit)
-    tasks = await cursor.to_list(length=limit)
-
-    return [
-        {
-            "task_id": task["_id"],
-            "task_id_display": task["task_id"],
-            "patient_id": task["patient_id"],
-            "patient_name": task.get("patient_name"),
-            "title": task["title"],
-            "description": task["description"],
-            "priority": task["priority"],
-            "state": task["state"],
-            "assigned_to": task["assigned_to"],
-            "agent_type": task["agent_type"],
-            "confidence_score": task.get("confidence_score"),
-            "created_at": task["created_at"].isoformat(),
-        }
-        for task in tasks
-    ]
+    cursor = (
+        db.tasks.find(
+            query,
+            {
+                "task_id": 1,
+                "patient_id": 1,
+                "patient_name": 1,
+                "title": 1,
+                "description": 1,
+                "priority": 1,
+                "state": 1,
+                "assigned_to": 1,
+                "agent_type": 1,
+                "confidence_score": 1,
+                "created_at": 1,
+            },
+        )
+        .sort([("created_at", -1), ("_id", -1)])
+        .limit(limit)
+        .batch_size(limit)
+    )
+    result = []
+    async for task in cursor:
+        result.append(
+            {
+                "task_id": task["_id"],
+                "task_id_display": task["task_id"],
+                "patient_id": task["patient_id"],
+                "patient_name": task.get("patient_name"),
+                "title": task["title"],
+                "description": task["description"],
+                "priority": task["priority"],
+                "state": task["state"],
+                "assigned_to": task["assigned_to"],
+                "agent_type": task["agent_type"],
+                "confidence_score": task.get("confidence_score"),
+                "created_at": task["created_at"].isoformat(),
+                "cursor": page_cursor(task["created_at"], task["_id"]),
+            }
+        )
+    return result
 
 
 def main():
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Any, Dict
+
+
+def page_cursor(created_at: datetime, row_id: str) -> str:
+    """Encode a row's position for the `after` parameter of the get_* tools"""
+    return f"{created_at.isoformat()}|{row_id}"
+
+
+def after_filter(after: str) -> Dict[str, Any]:
+    """Keyset filter for rows sorted by (created_at, _id) descending that come after `after`
+
+    Raises ValueError if `after` is not a cursor produced by page_cursor.
+    """
+    created_at, sep, row_id = after.partition("|")
+    if not sep or not row_id:
+        raise ValueError(f"invalid cursor: {after!r}")
+    ts = datetime.fromisoformat(created_at)
+    return {
+        "$or": [
+            {"created_at": {"$lt": ts}},
+            {"created_at": ts, "_id": {"$lt": row_id}},
+        ]
+    }
@@ -6,6 +6,7 @@ Run with: python seed_data.py
 import asyncio
 import os
 import random
+import sys
 from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
@@ -256,6 +257,7 @@ async def seed_database():
             "mrn": mrn,
             "first_name": patient_data["first_name"],
             "last_name": patient_data["last_name"],
+            "name": full_name,
             "age": patient_data["age"],
             "dob": patient_data["dob"],
             "gender": patient_data["gender"],
@@ -753,5 +755,31 @@ async def seed_database():
     print("")
 
 
+async def backfill_patient_names():
+    """One-off migration: set name on patients stored before the field existed"""
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client.backlinemd
+
+    result = await db.patients.update_many(
+        {"tenant_id": DEFAULT_TENANT, "name": {"$exists": False}},
+        [
+            {
+                "$set": {
+                    "name": {
+                        "$trim": {
+                            "input": {"$concat": ["$first_name", " ", "$last_name"]}
+                        }
+                    }
+                }
+            }
+        ],
+    )
+    client.close()
+    print(f"✓ Backfilled name on {result.modified_count} patients")
+
+
 if __name__ == "__main__":
-    asyncio.run(seed_database())
+    if "--backfill-names" in sys.argv:
+        asyncio.run(backfill_patient_names())
+    else:
+        asyncio.run(seed_database())
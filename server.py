@@ -18,6 +18,7 @@ ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / ".env")
 
 # Import our modules
+from background import spawn_background
 from database import close_db, connect_db, get_db
 from logger import get_logger
 from models import *
@@ -116,6 +117,7 @@ async def list_patients(
 async def create_patient(patient_data: PatientCreate):
     db = get_db()
     tenant_id = DEFAULT_TENANT
+    now = datetime.now(timezone.utc)
 
     patient_id = str(uuid.uuid4())
     mrn = f"MRN{random.randint(100000, 999999)}"
@@ -129,7 +131,7 @@ async def create_patient(patient_data: PatientCreate):
     if patient_data.dob:
         try:
             dob_date = datetime.strptime(patient_data.dob, "%Y-%m-%d").date()
-            today = datetime.now(timezone.utc).date()
+            today = now.date()
             age = (
                 today.year
                 - dob_date.year
@@ -143,7 +145,7 @@ async def create_patient(patient_data: PatientCreate):
         {
             "stage": "Initial Consultation",
             "status": "pending",
-            "date": datetime.now(timezone.utc).isoformat(),
+            "date": now.isoformat(),
             "notes": "Patient intake in progress",
         }
     ]
@@ -174,12 +176,12 @@ async def create_patient(patient_data: PatientCreate):
         "treatment_timeline": treatment_timeline,
         "ai_summary": None,
         "insurance": {},
-        "tasks_count": 0,
+        "tasks_count": 3,  # The three onboarding tasks created below
         "appointments_count": 0,
         "flagged_count": 0,
         "search": {"ngrams": ngrams},
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "created_at": now,
+        "updated_at": now,
         "created_by": "demo-user",
     }
 
@@ -200,7 +202,7 @@ async def create_patient(patient_data: PatientCreate):
             {
                 "$set": {
                     "ai_summary": summary_text,
-                    "ai_summary_generated_at": datetime.now(timezone.utc),
+                    "ai_summary_generated_at": now,
                 }
             },
         )
@@ -227,107 +229,99 @@ async def create_patient(patient_data: PatientCreate):
         },
     ]
 
-    created_forms = []
+    consent_forms = []
     for i, form_template in enumerate(default_forms):
-        consent_form_id = str(uuid.uuid4())
-        consent_form = {
-            "_id": consent_form_id,
-            "tenant_id": tenant_id,
-            "patient_id": patient_id,
-            "patient_name": full_name,
-            "template_id": f"template-{i}",
-            "form_type": form_template.get("name", "consent"),
-            "title": form_template.get("name", "Consent Form"),
-            "status": "to_do",
-            "sent_via": None,
-            "sent_at": None,
-            "signed_at": None,
-            "created_at": datetime.now(timezone.utc),
-            "updated_at": datetime.now(timezone.utc),
-        }
-        await db.consent_forms.insert_one(consent_form)
-        created_forms.append(consent_form_id)
+        consent_forms.append(
+            {
+                "_id": str(uuid.uuid4()),
+                "tenant_id": tenant_id,
+                "patient_id": patient_id,
+                "patient_name": full_name,
+                "template_id": f"template-{i}",
+                "form_type": form_template.get("name", "consent"),
+                "title": form_template.get("name", "Consent Form"),
+                "status": "to_do",
+                "sent_via": None,
+                "sent_at": None,
+                "signed_at": None,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
 
     # Create tasks for the patient
-    tasks_created = []
+    task_numbers = random.choices(range(10000, 100000), k=3)
+
+    # Text shared by every onboarding task title and description
+    title_suffix = f" - {full_name}"
+    created_note = f"New patient {full_name} has been created."
+
+    # Fields shared by every onboarding task
+    task_base = {
+        "tenant_id": tenant_id,
+        "source": "agent",
+        "patient_id": patient_id,
+        "patient_name": full_name,
+        "confidence_score": 1.0,
+        "waiting_minutes": 0,
+        "created_at": now,
+        "updated_at": now,
+        "created_by": "ai_agent",
+    }
 
     # Task 1: Send consent email - TODO (open)
     consent_email_task_id = str(uuid.uuid4())
     consent_email_task = {
+        **task_base,
         "_id": consent_email_task_id,
-        "task_id": f"T{random.randint(10000, 99999)}",
-        "tenant_id": tenant_id,
-        "source": "agent",
+        "task_id": f"T{task_numbers[0]}",
         "kind": "consent_forms",
-        "title": f"Send Consent Email to Patient - {full_name}",
-        "description": f"New patient {full_name} has been created. Please send consent forms email to the patient.",
-        "patient_id": patient_id,
-        "patient_name": full_name,
+        "title": f"Send Consent Email to Patient{title_suffix}",
+        "description": f"{created_note} Please send consent forms email to the patient.",
         "assigned_to": "Dr. James O'Brien",
         "agent_type": "care_taker",
         "priority": "medium",
         "state": "open",
-        "confidence_score": 1.0,
-        "waiting_minutes": 0,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
-        "created_by": "ai_agent",
     }
-    await db.tasks.insert_one(consent_email_task)
-    tasks_created.append(consent_email_task_id)
-    await db.patients.update_one({"_id": patient_id}, {"$inc": {"tasks_count": 1}})
 
     # Task 2: Document extraction - TODO (open)
     doc_extraction_task_id = str(uuid.uuid4())
     doc_extraction_task = {
+        **task_base,
         "_id": doc_extraction_task_id,
-        "task_id": f"T{random.randint(10000, 99999)}",
-        "tenant_id": tenant_id,
-        "source": "agent",
+        "task_id": f"T{task_numbers[1]}",
         "kind": "document_review",
-        "title": f"Extract and Review Patient Documents - {full_name}",
-        "description": f"New patient {full_name} has been created. Please review and extract information from any uploaded documents. Ensure all medical records are properly processed and indexed.",
-        "patient_id": patient_id,
-        "patient_name": full_name,
+        "title": f"Extract and Review Patient Documents{title_suffix}",
+        "description": f"{created_note} Please review and extract information from any uploaded documents. Ensure all medical records are properly processed and indexed.",
         "assigned_to": "AI - Document Extractor",
         "agent_type": "doc_extraction",
         "priority": "medium",
         "state": "open",
-        "confidence_score": 1.0,
-        "waiting_minutes": 0,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
-        "created_by": "ai_agent",
     }
-    await db.tasks.insert_one(doc_extraction_task)
-    tasks_created.append(doc_extraction_task_id)
-    await db.patients.update_one({"_id": patient_id}, {"$inc": {"tasks_count": 1}})
 
     # Task 3: Intake agent - send welcome email asking for medical records (in_progress)
     welcome_email_task_id = str(uuid.uuid4())
     welcome_email_task = {
+        **task_base,
         "_id": welcome_email_task_id,
-        "task_id": f"T{random.randint(10000, 99999)}",
-        "tenant_id": tenant_id,
-        "source": "agent",
+        "task_id": f"T{task_numbers[2]}",
         "kind": "welcome_email",
-        "title": f"Send Welcome Email and Request Medical Records - {full_name}",
-        "description": f"New patient {full_name} has been created. Send welcome email and request medical records from the patient.",
-        "patient_id": patient_id,
-        "patient_name": full_name,
+        "title": f"Send Welcome Email and Request Medical Records{title_suffix}",
+        "description": f"{created_note} Send welcome email and request medical records from the patient.",
         "assigned_to": "AI - Intake Agent",
         "agent_type": "intake",
         "priority": "high",
         "state": "in_progress",
-        "confidence_score": 1.0,
-        "waiting_minutes": 0,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
-        "created_by": "ai_agent",
     }
-    await db.tasks.insert_one(welcome_email_task)
-    tasks_created.append(welcome_email_task_id)
-    await db.patients.update_one({"_id": patient_id}, {"$inc": {"tasks_count": 1}})
+
+    onboarding_tasks = [consent_email_task, doc_extraction_task, welcome_email_task]
+
+    # Consent forms and tasks are independent batches, write them concurrently
+    await asyncio.gather(
+        db.consent_forms.insert_many(consent_forms, ordered=False),
+        db.tasks.insert_many(onboarding_tasks, ordered=False),
+    )
+    tasks_created = [task["_id"] for task in onboarding_tasks]
 
     # Send welcome email
     email_result = None
@@ -362,6 +356,7 @@ async def create_patient(patient_data: PatientCreate):
 async def get_patient(patient_id: str):
     db = get_db()
     tenant_id = DEFAULT_TENANT
+    now = datetime.now(timezone.utc)
 
     patient = await db.patients.find_one({"_id": patient_id, "tenant_id": tenant_id})
     if not patient:
@@ -373,7 +368,6 @@ async def get_patient(patient_id: str):
         .sort("created_at", -1)
         .limit(50)
     )
-    notes = await notes_cursor.to_list(length=50)
 
     # Get tasks for this patient (exclude tasks marked as "done")
     tasks_cursor = (
@@ -387,18 +381,16 @@ async def get_patient(patient_id: str):
         .sort("created_at", -1)
         .limit(50)
     )
-    tasks = await tasks_cursor.to_list(length=50)
 
-    # Debug logging
-    print(f"DEBUG: Fetching tasks for patient_id: {patient_id}, tenant_id: {tenant_id}")
+    # Notes and tasks are independent reads, fetch them concurrently
+    notes, tasks = await asyncio.gather(
+        notes_cursor.to_list(length=50), tasks_cursor.to_list(length=50)
+    )
+
     print(
-        f"DEBUG: Found {len(tasks)} active tasks for patient {patient_id} (excluding done tasks)"
+        f"DEBUG: Found {len(tasks)} active tasks for patient {patient_id}: "
+        f"{[task['_id'] for task in tasks]}"
     )
-    if tasks:
-        for task in tasks:
-            print(
-                f"  - Task: {task.get('title')}, patient_id: {task.get('patient_id')}, state: {task.get('state')}"
-            )
 
     # Get AI summary from patient document (no caching)
     ai_summary = patient.get("ai_summary")
@@ -408,7 +400,7 @@ async def get_patient(patient_id: str):
     if not age and patient.get("dob"):
         try:
             dob_date = datetime.strptime(patient["dob"], "%Y-%m-%d").date()
-            today = datetime.now(timezone.utc).date()
+            today = now.date()
             age = (
                 today.year
                 - dob_date.year
@@ -447,14 +439,10 @@ async def get_patient(patient_id: str):
         "notes": [
             {
                 "note_id": note["_id"],
-                "date": note.get("created_at", datetime.now(timezone.utc)).strftime(
-                    "%Y-%m-%d"
-                ),
+                "date": note.get("created_at", now).strftime("%Y-%m-%d"),
                 "author": note.get("author", "Unknown"),
                 "content": note.get("content", ""),
-                "created_at": note.get(
-                    "created_at", datetime.now(timezone.utc)
-                ).isoformat(),
+                "created_at": note.get("created_at", now).isoformat(),
             }
             for note in notes
         ],
@@ -471,7 +459,7 @@ async def get_patient(patient_id: str):
                 "confidence_score": task.get("confidence_score"),
                 "waiting_minutes": task.get("waiting_minutes", 0),
                 "created_at": (
-                    task.get("created_at", datetime.now(timezone.utc)).isoformat()
+                    task.get("created_at", now).isoformat()
                     if isinstance(task.get("created_at"), datetime)
                     else task.get("created_at")
                 ),
@@ -608,9 +596,12 @@ async def create_patient_note(patient_id: str, note_data: dict):
     """Create a new patient note"""
     db = get_db()
     tenant_id = DEFAULT_TENANT
+    now = datetime.now(timezone.utc)
 
     # Verify patient exists
-    patient = await db.patients.find_one({"_id": patient_id, "tenant_id": tenant_id})
+    patient = await db.patients.find_one(
+        {"_id": patient_id, "tenant_id": tenant_id}, {"_id": 1}
+    )
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
 
@@ -621,8 +612,8 @@ async def create_patient_note(patient_id: str, note_data: dict):
         "patient_id": patient_id,
         "content": note_data.get("content", ""),
         "author": note_data.get("author", "Unknown"),
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "created_at": now,
+        "updated_at": now,
     }
 
     await db.patient_notes.insert_one(note)
@@ -680,6 +671,7 @@ async def upload_document(
 ):
     db = get_db()
     tenant_id = DEFAULT_TENANT
+    now = datetime.now(timezone.utc)
 
     # In production, upload to S3. For now, just store metadata
     document_id = str(uuid.uuid4())
@@ -699,14 +691,16 @@ async def upload_document(
         "ocr": {"done": False, "engine": None},
         "extracted": {},
         "status": DocumentStatus.UPLOADED,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "created_at": now,
+        "updated_at": now,
     }
 
     await db.documents.insert_one(document)
 
     # Trigger document extraction agent (async)
-    asyncio.create_task(trigger_document_extraction(document_id, tenant_id))
+    spawn_background(
+        trigger_document_extraction(document_id, tenant_id), "document extraction"
+    )
 
     return {
         "document_id": document_id,
@@ -810,9 +804,14 @@ async def trigger_document_extraction(document_id: str, tenant_id: str):
 
     # If low confidence, create task
     if confidence < 0.9:
-        doc = await db.documents.find_one({"_id": document_id})
-        patient = await db.patients.find_one({"_id": doc["patient_id"]})
+        doc = await db.documents.find_one(
+            {"_id": document_id}, {"patient_id": 1, "file.name": 1}
+        )
+        patient = await db.patients.find_one(
+            {"_id": doc["patient_id"]}, {"first_name": 1, "last_name": 1}
+        )
 
+        now = datetime.now(timezone.utc)
         task_id = str(uuid.uuid4())
         task = {
             "_id": task_id,
@@ -832,8 +831,8 @@ async def trigger_document_extraction(document_id: str, tenant_id: str):
             "confidence_score": confidence,
             "waiting_minutes": 0,
             "ai_resume_hook": None,
-            "created_at": datetime.now(timezone.utc),
-            "updated_at": datetime.now(timezone.utc),
+            "created_at": now,
+            "updated_at": now,
         }
 
         await db.tasks.insert_one(task)
@@ -867,30 +866,15 @@ async def list_tasks(
         query["state"] = {"$ne": "done"}
     if patient_id:
         query["patient_id"] = patient_id
-        # Debug logging
-        print(f"DEBUG: Filtering tasks by patient_id: {patient_id}")
     if assignee_id:
         query["assignee_id"] = assignee_id
     if priority:
         query["priority"] = priority
 
-    # Debug: Count total tasks and tasks matching query
-    total_tasks = await db.tasks.count_documents({"tenant_id": tenant_id})
-    matching_tasks = await db.tasks.count_documents(query)
-    print(
-        f"DEBUG: Total tasks in DB: {total_tasks}, Matching query: {matching_tasks}, Query: {query}"
-    )
-
     cursor = db.tasks.find(query).skip(skip).limit(limit).sort("created_at", -1)
     tasks = await cursor.to_list(length=limit)
 
-    # Debug: Log found tasks
-    if patient_id:
-        print(f"DEBUG: Found {len(tasks)} tasks for patient_id: {patient_id}")
-        for task in tasks:
-            print(
-                f"  - Task: {task.get('title')}, patient_id: {task.get('patient_id')}, state: {task.get('state')}"
-            )
+    print(f"DEBUG: Found {len(tasks)} tasks for query: {query}")
 
     return [
         {
@@ -912,15 +896,14 @@ async def list_tasks(
 
 @app.post("/api/tasks")
 async def create_task(task_data: TaskCreate):
-    from database import get_client
-
     db = get_db()
-    client = get_client()
     tenant_id = DEFAULT_TENANT
+    now = datetime.now(timezone.utc)
 
     # Get patient name
     patient = await db.patients.find_one(
-        {"_id": task_data.patient_id, "tenant_id": tenant_id}
+        {"_id": task_data.patient_id, "tenant_id": tenant_id},
+        {"first_name": 1, "last_name": 1},
     )
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
@@ -942,34 +925,22 @@ async def create_task(task_data: TaskCreate):
         "state": TaskState.OPEN,
         "confidence_score": 1.0,
         "waiting_minutes": 0,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "created_at": now,
+        "updated_at": now,
         "created_by": "demo-user",
     }
 
-    # Use transaction to ensure atomicity
+    # Bump the denormalized counter, and undo it if the insert fails
+    await db.patients.update_one(
+        {"_id": task_data.patient_id}, {"$inc": {"tasks_count": 1}}
+    )
     try:
-        if client:
-            async with client.start_session() as session:
-                async with session.start_transaction():
-                    await db.tasks.insert_one(task, session=session)
-                    await db.patients.update_one(
-                        {"_id": task_data.patient_id},
-                        {"$inc": {"tasks_count": 1}},
-                        session=session,
-                    )
-        else:
-            # Fallback without transaction
-            await db.tasks.insert_one(task)
-            await db.patients.update_one(
-                {"_id": task_data.patient_id}, {"$inc": {"tasks_count": 1}}
-            )
-    except Exception as e:
-        # Fallback without transaction if session fails
         await db.tasks.insert_one(task)
+    except Exception:
         await db.patients.update_one(
-            {"_id": task_data.patient_id}, {"$inc": {"tasks_count": 1}}
+            {"_id": task_data.patient_id}, {"$inc": {"tasks_count": -1}}
         )
+        raise
 
     return {"task_id": task_id, "message": "Task created successfully"}
 
@@ -978,6 +949,7 @@ async def create_task(task_data: TaskCreate):
 async def update_task(task_id: str, update_data: TaskUpdate):
     db = get_db()
     tenant_id = DEFAULT_TENANT
+    now = datetime.now(timezone.utc)
 
     update_operations = {}
 
@@ -985,7 +957,7 @@ async def update_task(task_id: str, update_data: TaskUpdate):
     set_fields = {}
     if update_data.state:
         set_fields["state"] = update_data.state
-    set_fields["updated_at"] = datetime.now(timezone.utc)
+    set_fields["updated_at"] = now
     update_operations["$set"] = set_fields
 
     # Handle $push operations
@@ -994,7 +966,7 @@ async def update_task(task_id: str, update_data: TaskUpdate):
             "comments": {
                 "user_id": "demo-user",
                 "text": update_data.comment,
-                "created_at": datetime.now(timezone.utc),
+                "created_at": now,
             }
         }
 
@@ -1013,11 +985,12 @@ async def update_appointment(appointment_id: str, update_data: dict):
     """Update appointment status and create insurance verification task if completed"""
     db = get_db()
     tenant_id = DEFAULT_TENANT
+    now = datetime.now(timezone.utc)
 
     update_fields = {}
     if update_data.get("status"):
         update_fields["status"] = update_data["status"]
-    update_fields["updated_at"] = datetime.now(timezone.utc)
+    update_fields["updated_at"] = now
 
     result = await db.appointments.update_one(
         {"_id": appointment_id, "tenant_id": tenant_id}, {"$set": update_fields}
@@ -1029,11 +1002,12 @@ async def update_appointment(appointment_id: str, update_data: dict):
     # If appointment is marked as completed, create insurance verification task
     if update_data.get("status") == "completed":
         appointment = await db.appointments.find_one(
-            {"_id": appointment_id, "tenant_id": tenant_id}
+            {"_id": appointment_id, "tenant_id": tenant_id}, {"patient_id": 1}
         )
         if appointment:
             patient = await db.patients.find_one(
-                {"_id": appointment["patient_id"], "tenant_id": tenant_id}
+                {"_id": appointment["patient_id"], "tenant_id": tenant_id},
+                {"first_name": 1, "last_name": 1},
             )
             if patient:
                 patient_name = (
@@ -1058,8 +1032,8 @@ async def update_appointment(appointment_id: str, update_data: dict):
                     "state": TaskState.OPEN,
                     "confidence_score": 1.0,
                     "waiting_minutes": 0,
-                    "created_at": datetime.now(timezone.utc),
-                    "updated_at": datetime.now(timezone.utc),
+                    "created_at": now,
+                    "updated_at": now,
                     "created_by": "ai_agent",
                 }
 
@@ -1114,10 +1088,12 @@ async def list_claims(
 async def create_claim(claim_data: ClaimCreate):
     db = get_db()
     tenant_id = DEFAULT_TENANT
+    now = datetime.now(timezone.utc)
 
     # Get patient
     patient = await db.patients.find_one(
-        {"_id": claim_data.patient_id, "tenant_id": tenant_id}
+        {"_id": claim_data.patient_id, "tenant_id": tenant_id},
+        {"first_name": 1, "last_name": 1},
     )
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
@@ -1137,12 +1113,12 @@ async def create_claim(claim_data: ClaimCreate):
         "procedure_code": claim_data.procedure_code,
         "diagnosis_code": claim_data.diagnosis_code,
         "service_date": claim_data.service_date,
-        "submitted_date": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+        "submitted_date": now.strftime("%Y-%m-%d"),
         "description": claim_data.description,
         "status": ClaimStatus.PENDING,
-        "last_event_at": datetime.now(timezone.utc),
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "last_event_at": now,
+        "created_at": now,
+        "updated_at": now,
     }
 
     await db.claims.insert_one(claim)
@@ -1154,9 +1130,9 @@ async def create_claim(claim_data: ClaimCreate):
         "claim_id": claim_id,
         "event_type": "submitted",
         "description": f"Claim submitted to {claim_data.insurance_provider} for ${claim_data.amount:.2f}",
-        "at": datetime.now(timezone.utc),
-        "time": datetime.now(timezone.utc).strftime("%I:%M %p"),
-        "created_at": datetime.now(timezone.utc),
+        "at": now,
+        "time": now.strftime("%I:%M %p"),
+        "created_at": now,
     }
 
     await db.claim_events.insert_one(event)
@@ -1284,73 +1260,24 @@ async def list_appointments(
     return result
 
 
-@app.post("/api/appointments")
-async def create_appointment(appointment_data: AppointmentCreate):
-    from database import get_client
-
+async def send_appointment_confirmation(
+    patient_id: str, tenant_id: str, starts_at, appointment_type: str
+):
+    """Email the patient their appointment details"""
     db = get_db()
-    client = get_client()
-    tenant_id = DEFAULT_TENANT
-
-    appointment_id = str(uuid.uuid4())
 
-    appointment = {
-        "_id": appointment_id,
-        "tenant_id": tenant_id,
-        "patient_id": appointment_data.patient_id,
-        "provider_id": appointment_data.provider_id,
-        "type": appointment_data.type,
-        "title": appointment_data.title,
-        "starts_at": appointment_data.starts_at,
-        "ends_at": appointment_data.ends_at,
-        "location": appointment_data.location,
-        "status": "scheduled",
-        "google_calendar": {
-            "event_id": f"mock-event-{appointment_id[:8]}",
-            "calendar_id": "primary",
-        },
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
-    }
-
-    # Use transaction to ensure atomicity
-    try:
-        if client:
-            async with client.start_session() as session:
-                async with session.start_transaction():
-                    await db.appointments.insert_one(appointment, session=session)
-                    await db.patients.update_one(
-                        {"_id": appointment_data.patient_id},
-                        {"$inc": {"appointments_count": 1}},
-                        session=session,
-                    )
-        else:
-            # Fallback without transaction
-            await db.appointments.insert_one(appointment)
-            await db.patients.update_one(
-                {"_id": appointment_data.patient_id},
-                {"$inc": {"appointments_count": 1}},
-            )
-    except Exception as e:
-        # Fallback without transaction if session fails
-        await db.appointments.insert_one(appointment)
-        await db.patients.update_one(
-            {"_id": appointment_data.patient_id}, {"$inc": {"appointments_count": 1}}
-        )
-
-    # Send appointment confirmation email
     try:
         from composio_integration import send_appointment_scheduled_email
 
         patient = await db.patients.find_one(
-            {"_id": appointment_data.patient_id, "tenant_id": tenant_id}
+            {"_id": patient_id, "tenant_id": tenant_id},
+            {"first_name": 1, "last_name": 1, "contact.email": 1},
         )
         if patient:
             patient_name = (
                 f"{patient.get('first_name', '')} {patient.get('last_name', '')}"
             )
             # Format appointment date and time
-            starts_at = appointment_data.starts_at
             if isinstance(starts_at, datetime):
                 appointment_date = starts_at.strftime("%Y-%m-%d")
                 appointment_time = starts_at.strftime("%I:%M %p")
@@ -1373,7 +1300,7 @@ async def create_appointment(appointment_data: AppointmentCreate):
                 patient_name=patient_name,
                 date=appointment_date,
                 time=appointment_time,
-                type=appointment_data.type,
+                type=appointment_type,
                 provider="Dr. James O'Brien",
             )
             print(
@@ -1382,6 +1309,58 @@ async def create_appointment(appointment_data: AppointmentCreate):
     except Exception as e:
         print(f"Warning: Failed to send appointment confirmation email: {e}")
 
+
+@app.post("/api/appointments")
+async def create_appointment(appointment_data: AppointmentCreate):
+    db = get_db()
+    tenant_id = DEFAULT_TENANT
+    now = datetime.now(timezone.utc)
+
+    appointment_id = str(uuid.uuid4())
+
+    appointment = {
+        "_id": appointment_id,
+        "tenant_id": tenant_id,
+        "patient_id": appointment_data.patient_id,
+        "provider_id": appointment_data.provider_id,
+        "type": appointment_data.type,
+        "title": appointment_data.title,
+        "starts_at": appointment_data.starts_at,
+        "ends_at": appointment_data.ends_at,
+        "location": appointment_data.location,
+        "status": "scheduled",
+        "google_calendar": {
+            "event_id": f"mock-event-{appointment_id[:8]}",
+            "calendar_id": "primary",
+        },
+        "created_at": now,
+        "updated_at": now,
+    }
+
+    # Bump the denormalized counter, and undo it if the insert fails
+    await db.patients.update_one(
+        {"_id": appointment_data.patient_id}, {"$inc": {"appointments_count": 1}}
+    )
+    try:
+        await db.appointments.insert_one(appointment)
+    except Exception:
+        await db.patients.update_one(
+            {"_id": appointment_data.patient_id},
+            {"$inc": {"appointments_count": -1}},
+        )
+        raise
+
+    # Send appointment confirmation email off the request path
+    spawn_background(
+        send_appointment_confirmation(
+            appointment_data.patient_id,
+            tenant_id,
+            appointment_data.starts_at,
+            appointment_data.type,
+        ),
+        "appointment confirmation email",
+    )
+
     return {
         "appointment_id": appointment_id,
         "google_calendar": {
@@ -1400,25 +1379,28 @@ async def get_dashboard_stats():
     db = get_db()
     tenant_id = DEFAULT_TENANT
 
-    pending_tasks = await db.tasks.count_documents(
-        {"tenant_id": tenant_id, "state": TaskState.OPEN}
-    )
-
     today = datetime.now(timezone.utc).date()
-    appointments_today = await db.appointments.count_documents(
-        {
-            "tenant_id": tenant_id,
-            "starts_at": {
-                "$gte": datetime.combine(today, datetime.min.time()),
-                "$lt": datetime.combine(today + timedelta(days=1), datetime.min.time()),
-            },
-        }
-    )
-
-    patients_total = await db.patients.count_documents({"tenant_id": tenant_id})
 
-    claims_pending = await db.claims.count_documents(
-        {"tenant_id": tenant_id, "status": ClaimStatus.PENDING}
+    # The four counts are independent, so run them concurrently
+    pending_tasks, appointments_today, patients_total, claims_pending = (
+        await asyncio.gather(
+            db.tasks.count_documents({"tenant_id": tenant_id, "state": TaskState.OPEN}),
+            db.appointments.count_documents(
+                {
+                    "tenant_id": tenant_id,
+                    "starts_at": {
+                        "$gte": datetime.combine(today, datetime.min.time()),
+                        "$lt": datetime.combine(
+                            today + timedelta(days=1), datetime.min.time()
+                        ),
+                    },
+                }
+            ),
+            db.patients.count_documents({"tenant_id": tenant_id}),
+            db.claims.count_documents(
+                {"tenant_id": tenant_id, "status": ClaimStatus.PENDING}
+            ),
+        )
     )
 
     return {
@@ -1540,7 +1522,10 @@ async def send_consent_forms(data: dict):
         raise HTTPException(status_code=400, detail="patient_id is required")
 
     # Get patient
-    patient = await db.patients.find_one({"_id": patient_id, "tenant_id": tenant_id})
+    patient = await db.patients.find_one(
+        {"_id": patient_id, "tenant_id": tenant_id},
+        {"first_name": 1, "last_name": 1, "contact.email": 1},
+    )
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
 
@@ -1562,7 +1547,8 @@ async def send_consent_forms(data: dict):
                 "tenant_id": tenant_id,
                 "kind": "consent_forms",
                 "state": "open",
-            }
+            },
+            {"_id": 1},
         )
 
         if consent_task and email_result.get("success"):
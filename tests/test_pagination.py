@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from pagination import after_filter, page_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 3, 4, 15, 7, 9, 123000, tzinfo=timezone.utc)
+    row_id = "0b7e6f9a-3c1d-4e2f-9a8b-7c6d5e4f3a2b"
+
+    query = after_filter(page_cursor(created_at, row_id))
+
+    assert query == {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": row_id}},
+        ]
+    }
+
+
+def test_cursor_round_trip_naive_datetime():
+    # Motor/PyMongo return naive UTC datetimes unless tz_aware is set
+    created_at = datetime(2025, 3, 4, 15, 7, 9)
+
+    query = after_filter(page_cursor(created_at, "abc"))
+
+    assert query["$or"][0] == {"created_at": {"$lt": created_at}}
+
+
+@pytest.mark.parametrize(
+    "after",
+    [
+        "2025-03-04T15:07:09",
+        "2025-03-04T15:07:09|",
+        "not-a-date|abc",
+        "|abc",
+    ],
+)
+def test_malformed_cursor_raises_value_error(after):
+    with pytest.raises(ValueError):
+        after_filter(after)